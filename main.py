@@ -1,32 +1,142 @@
+import asyncio
+import hashlib
 import os
 import queue
+import re
+import sqlite3
 import sys
 import threading
 import time
-from collections import OrderedDict
+from collections import OrderedDict, deque
 import pyperclip
 import pytesseract
-from PIL import ImageGrab
+from PIL import Image, ImageGrab
 from PySide6.QtWidgets import QApplication, QWidget, QTextEdit, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QFileDialog, QLineEdit, QMessageBox, QCheckBox
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QObject, QTimer, Signal
+from PySide6.QtGui import QTextCursor
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     OPENAI_SDK = True
 except Exception:
     import openai
     OPENAI_SDK = False
+try:
+    from lru import LRU
+    HAS_LRU_DICT = True
+except Exception:
+    HAS_LRU_DICT = False
+try:
+    from rapidfuzz import fuzz
+    HAS_RAPIDFUZZ = True
+except Exception:
+    HAS_RAPIDFUZZ = False
+try:
+    import xxhash
+    HAS_XXHASH = True
+except Exception:
+    HAS_XXHASH = False
+try:
+    import cv2
+    import numpy as np
+    HAS_CV2 = True
+except Exception:
+    HAS_CV2 = False
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    HAS_TESSEROCR = True
+except ImportError:
+    HAS_TESSEROCR = False
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except Exception:
+    HAS_WATCHDOG = False
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except Exception:
+    HAS_NUMBA = False
+
+_NUMBERED_LINE = re.compile(r'^\s*(\d+)\.\s*(.*)$')
+_PUNCT = re.compile(r'[^\w\s]')
+_LINE_SPLIT = re.compile(r'[\r\n]+')
+
+def _phash64(gray):
+    h, w = gray.shape
+    bh = h // 8
+    bw = w // 8
+    if bh == 0 or bw == 0:
+        return 0
+    blocks = gray[:bh*8, :bw*8].reshape(8, bh, 8, bw).mean(axis=(1, 3))
+    avg = blocks.mean()
+    flat = blocks.ravel()
+    bits = 0
+    for i in range(64):
+        if flat[i] > avg:
+            bits |= 1 << i
+    return bits
+
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _phash64(gray):
+        h, w = gray.shape
+        bh = h // 8
+        bw = w // 8
+        if bh == 0 or bw == 0:
+            return np.uint64(0)
+        means = np.empty(64, dtype=np.float64)
+        total = 0.0
+        for by in range(8):
+            for bx in range(8):
+                s = 0.0
+                for y in range(by*bh, (by+1)*bh):
+                    for x in range(bx*bw, (bx+1)*bw):
+                        s += gray[y, x]
+                m = s / (bh*bw)
+                means[by*8+bx] = m
+                total += m
+        avg = total / 64.0
+        bits = np.uint64(0)
+        one = np.uint64(1)
+        for i in range(64):
+            if means[i] > avg:
+                bits |= one << np.uint64(i)
+        return bits
+
+def _hamming64(a, b):
+    return bin(int(a) ^ int(b)).count('1')
+
+_ASYNC_LOOP = None
+_ASYNC_LOOP_LOCK = threading.Lock()
+
+def _ensure_loop():
+    global _ASYNC_LOOP
+    with _ASYNC_LOOP_LOCK:
+        if _ASYNC_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+            _ASYNC_LOOP = loop
+    return _ASYNC_LOOP
 
 class SimpleLRU:
     def __init__(self, capacity=500):
         self.capacity = capacity
-        self.cache = OrderedDict()
+        if HAS_LRU_DICT:
+            self.cache = LRU(capacity)
+        else:
+            self.cache = OrderedDict()
     def get(self, key):
+        if HAS_LRU_DICT:
+            return self.cache.get(key)
         if key in self.cache:
             self.cache.move_to_end(key)
             return self.cache[key]
         return None
     def put(self, key, value):
         self.cache[key] = value
+        if HAS_LRU_DICT:
+            return
         self.cache.move_to_end(key)
         if len(self.cache) > self.capacity:
             self.cache.popitem(last=False)
@@ -37,41 +147,148 @@ class FileAdapter:
         self._stop = False
     def stop(self):
         self._stop = True
-    def run(self, out_queue):
+    async def run(self, out_queue):
+        loop = asyncio.get_running_loop()
         try:
-            with open(self.path, 'r', encoding='utf-8', errors='ignore') as f:
+            with open(self.path, 'r', encoding='utf-8', errors='ignore', buffering=65536) as f:
                 f.seek(0, os.SEEK_END)
-                while not self._stop:
-                    line = f.readline()
-                    if line:
-                        out_queue.put(line.strip())
-                    else:
-                        time.sleep(0.1)
+                if HAS_WATCHDOG:
+                    await self._run_watchdog(f, out_queue, loop)
+                else:
+                    await self._run_polling(f, out_queue)
         except Exception as e:
             out_queue.put(f"__ERROR__ FileAdapter: {e}")
+    def _drain(self, f, out_queue):
+        while not self._stop:
+            chunk = f.readlines()
+            if not chunk:
+                break
+            for line in chunk:
+                s = line.strip()
+                if s:
+                    out_queue.put(s)
+    async def _run_watchdog(self, f, out_queue, loop):
+        path = os.path.abspath(self.path)
+        changed = asyncio.Event()
+        class _Handler(FileSystemEventHandler):
+            def on_modified(self, event):
+                if not event.is_directory and os.path.abspath(event.src_path) == path:
+                    loop.call_soon_threadsafe(changed.set)
+        observer = Observer()
+        observer.schedule(_Handler(), os.path.dirname(path) or '.')
+        observer.start()
+        try:
+            while not self._stop:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                changed.clear()
+                self._drain(f, out_queue)
+        finally:
+            observer.stop()
+            await loop.run_in_executor(None, observer.join, 2.0)
+    async def _run_polling(self, f, out_queue):
+        while not self._stop:
+            line = f.readline()
+            if line:
+                s = line.strip()
+                if s:
+                    out_queue.put(s)
+            else:
+                await asyncio.sleep(0.1)
 
 class OCRAdapter:
-    def __init__(self, bbox=(0,0,800,200), interval=0.6):
+    def __init__(self, bbox=(0,0,800,200), interval=0.6, target_height=260):
         self.bbox = bbox
         self.interval = interval
         self._stop = False
-        self._last_text = ""
+        self._recent = deque(maxlen=16)
+        self._last_hash = None
+        self._last_phash = None
+        self._target_h = target_height
+        self._buf = None
+        self._api = None
+        if HAS_TESSEROCR:
+            try:
+                self._api = PyTessBaseAPI(psm=PSM.SINGLE_BLOCK)
+            except Exception:
+                self._api = None
     def stop(self):
         self._stop = True
-    def run(self, out_queue):
-        while not self._stop:
+    def close(self):
+        if self._api is not None:
             try:
-                img = ImageGrab.grab(bbox=self.bbox)
-                text = pytesseract.image_to_string(img).replace('\r','\n')
-                lines = [l.strip() for l in text.split('\n') if l.strip()]
-                for l in lines:
-                    if l != self._last_text:
-                        out_queue.put(l)
-                        self._last_text = l
-                time.sleep(self.interval)
-            except Exception as e:
-                out_queue.put(f"__ERROR__ OCRAdapter: {e}")
-                time.sleep(1.0)
+                self._api.End()
+            except Exception:
+                pass
+            self._api = None
+    def _frame_hash(self, img):
+        buf = img.tobytes()
+        if HAS_XXHASH:
+            return xxhash.xxh3_64_intdigest(buf)
+        return hashlib.blake2b(buf, digest_size=8).digest()
+    def _gray(self, img):
+        arr = np.asarray(img)
+        return cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY) if arr.ndim == 3 else arr
+    def _binarize(self, gray):
+        if gray.shape[0] > self._target_h:
+            w = max(1, round(gray.shape[1] * self._target_h / gray.shape[0]))
+            if self._buf is None or self._buf.shape != (self._target_h, w):
+                self._buf = np.empty((self._target_h, w), dtype=np.uint8)
+            cv2.resize(gray, (w, self._target_h), dst=self._buf, interpolation=cv2.INTER_AREA)
+            gray = self._buf
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 31, 15)
+    def _ocr(self, prepped):
+        api = self._api
+        if api is not None:
+            if not isinstance(prepped, Image.Image):
+                prepped = Image.fromarray(prepped)
+            api.SetImage(prepped)
+            return api.GetUTF8Text()
+        return pytesseract.image_to_string(prepped, config='--psm 6')
+    def _is_duplicate(self, line):
+        norm = _PUNCT.sub('', line.casefold()).strip()
+        if not norm:
+            return True
+        if HAS_RAPIDFUZZ:
+            if any(fuzz.ratio(norm, r) >= 95 for r in self._recent):
+                return True
+        elif norm in self._recent:
+            return True
+        self._recent.append(norm)
+        return False
+    def _capture_text(self):
+        img = ImageGrab.grab(bbox=self.bbox)
+        h = self._frame_hash(img)
+        if h == self._last_hash:
+            return None
+        self._last_hash = h
+        if not HAS_CV2:
+            return self._ocr(img.convert('L'))
+        gray = self._gray(img)
+        ph = _phash64(gray)
+        if self._last_phash is not None and _hamming64(ph, self._last_phash) <= 3:
+            return None
+        self._last_phash = ph
+        return self._ocr(self._binarize(gray))
+    async def run(self, out_queue):
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._stop:
+                try:
+                    text = await loop.run_in_executor(None, self._capture_text)
+                    if text:
+                        for l in _LINE_SPLIT.split(text):
+                            s = l.strip()
+                            if s and not self._is_duplicate(s):
+                                out_queue.put(s)
+                    await asyncio.sleep(self.interval)
+                except Exception as e:
+                    out_queue.put(f"__ERROR__ OCRAdapter: {e}")
+                    await asyncio.sleep(1.0)
+        finally:
+            self.close()
 
 class ClipboardAdapter:
     def __init__(self, interval=0.15):
@@ -80,46 +297,152 @@ class ClipboardAdapter:
         self._last = None
     def stop(self):
         self._stop = True
-    def run(self, out_queue):
+    async def run(self, out_queue):
+        loop = asyncio.get_running_loop()
         while not self._stop:
             try:
-                txt = pyperclip.paste()
+                txt = await loop.run_in_executor(None, pyperclip.paste)
                 if isinstance(txt,str) and txt.strip() and txt != self._last:
                     self._last = txt
                     out_queue.put(txt.strip())
-                time.sleep(self.interval)
+                await asyncio.sleep(self.interval)
             except Exception as e:
                 out_queue.put(f"__ERROR__ ClipboardAdapter: {e}")
-                time.sleep(1.0)
+                await asyncio.sleep(1.0)
+
+class _TokenBucket:
+    def __init__(self, refill_per_s, capacity):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.refill_per_s = refill_per_s
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.refill_per_s)
+        self.last = now
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.refill_per_s)
+                self._refill()
+            self.tokens -= 1
 
 class Translator:
-    def __init__(self, api_key=None, model="gpt-4.1-mini", system_prompt=None):
+    def __init__(self, api_key=None, model="gpt-4.1-mini", system_prompt=None, cache_path=None, requests_per_minute=500, burst=10):
         self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
         self.model = model
         self.system_prompt = system_prompt or "You are a helpful translation assistant. Translate game chat while preserving tone, slang, and meaning."
+        self._system_msg = {"role":"system","content":self.system_prompt}
+        self._prompt_tmpl = {}
         self.cache = SimpleLRU(capacity=1500)
-        self._client = None
+        self._db = None
+        self._db_lock = threading.Lock()
+        try:
+            path = cache_path or os.path.join(os.path.expanduser('~'), '.gc_translate_cache.db')
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS tcache(k BLOB PRIMARY KEY, v TEXT)")
+            self._db.commit()
+        except Exception:
+            self._db = None
+        self._loop = _ensure_loop()
+        self._bucket = _TokenBucket(requests_per_minute/60.0, burst)
+        self._aclient = None
         if OPENAI_SDK:
-            self._client = OpenAI(api_key=self.api_key)
+            self._aclient = AsyncOpenAI(api_key=self.api_key)
         else:
             openai.api_key = self.api_key
-    def translate(self, text, target_language):
-        key = f"{target_language}::{text}"
-        cached = self.cache.get(key)
-        if cached:
-            return cached
+    def _key(self, text, target_language):
+        return hashlib.blake2b(target_language.encode('utf-8')+b'\x00'+text.encode('utf-8'), digest_size=16).digest()
+    def _disk_get(self, key):
+        if self._db is None:
+            return None
         try:
-            prompt = f"Translate the following chat message to {target_language}. Preserve tone and slang. Only return the translation text.\n\nMessage: {text}"
-            if OPENAI_SDK:
-                resp = self._client.chat.completions.create(model=self.model,messages=[{"role":"system","content":self.system_prompt},{"role":"user","content":prompt}],temperature=0.2,max_tokens=800)
-                translated = resp.choices[0].message.content.strip()
+            with self._db_lock:
+                row = self._db.execute("SELECT v FROM tcache WHERE k=?", (key,)).fetchone()
+            return row[0] if row else None
+        except Exception:
+            return None
+    def _disk_put_many(self, pairs):
+        if self._db is None or not pairs:
+            return
+        try:
+            with self._db_lock:
+                self._db.executemany("INSERT OR REPLACE INTO tcache(k,v) VALUES(?,?)", pairs)
+                self._db.commit()
+        except Exception:
+            pass
+    def translate(self, text, target_language):
+        return self.translate_batch([text], target_language)[0]
+    def translate_batch(self, texts, target_language):
+        return self.submit_batch(texts, target_language).result()
+    def submit_batch(self, texts, target_language):
+        return asyncio.run_coroutine_threadsafe(self._translate_batch(texts, target_language), self._loop)
+    async def _request(self, prompt):
+        await self._bucket.acquire()
+        messages = [self._system_msg,{"role":"user","content":prompt}]
+        if OPENAI_SDK:
+            resp = await self._aclient.chat.completions.create(model=self.model,messages=messages,temperature=0.2,max_tokens=800)
+            return resp.choices[0].message.content.strip()
+        resp = await self._loop.run_in_executor(None, lambda: openai.ChatCompletion.create(model=self.model,messages=messages,temperature=0.2,max_tokens=800))
+        return resp['choices'][0]['message']['content'].strip()
+    async def _translate_batch(self, texts, target_language):
+        results = [None]*len(texts)
+        keys = [self._key(text, target_language) for text in texts]
+        misses = []
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is None:
+                cached = self._disk_get(key)
+                if cached is not None:
+                    self.cache.put(key, cached)
+            if cached:
+                results[i] = cached
             else:
-                resp = openai.ChatCompletion.create(model=self.model,messages=[{"role":"system","content":self.system_prompt},{"role":"user","content":prompt}],temperature=0.2,max_tokens=800)
-                translated = resp['choices'][0]['message']['content'].strip()
-            self.cache.put(key, translated)
-            return translated
+                misses.append(i)
+        if not misses:
+            return results
+        try:
+            numbered = "\n".join(f"{n}. {texts[i]}" for n, i in enumerate(misses, 1))
+            header = self._prompt_tmpl.get(target_language)
+            if header is None:
+                header = self._prompt_tmpl.setdefault(target_language, f"Translate each numbered chat message below to {target_language}. Preserve tone and slang. Reply with the same numbered list, one translation per line, and nothing else.\n\n")
+            reply = await self._request(header + numbered)
+            parsed = self._parse_numbered(reply, len(misses))
+            done = []
+            for n, i in enumerate(misses):
+                translated = parsed[n]
+                if translated is None:
+                    results[i] = f"__ERROR__ Translator: missing line {n+1} in batch reply"
+                else:
+                    self.cache.put(keys[i], translated)
+                    done.append((keys[i], translated))
+                    results[i] = translated
+            self._disk_put_many(done)
         except Exception as e:
-            return f"__ERROR__ Translator: {e}"
+            for i in misses:
+                results[i] = f"__ERROR__ Translator: {e}"
+        return results
+    def _parse_numbered(self, reply, count):
+        parsed = [None]*count
+        current = None
+        for line in reply.split('\n'):
+            m = _NUMBERED_LINE.match(line)
+            if m and 1 <= int(m.group(1)) <= count:
+                current = int(m.group(1)) - 1
+                parsed[current] = m.group(2).strip()
+            elif current is not None and line.strip():
+                parsed[current] += "\n" + line.strip()
+        if count == 1 and parsed[0] is None and reply.strip():
+            parsed[0] = reply.strip()
+        return parsed
+
+class _Bridge(QObject):
+    translated = Signal(str, str)
+    errored = Signal(str)
 
 class TranslatorApp(QWidget):
     def __init__(self):
@@ -128,14 +451,19 @@ class TranslatorApp(QWidget):
         self.setGeometry(200,200,700,420)
         self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
         self.in_queue = queue.Queue()
-        self.out_queue = queue.Queue()
-        self.adapter_thread = None
+        self.bridge = _Bridge()
+        self.bridge.translated.connect(self._on_translated, Qt.QueuedConnection)
+        self.bridge.errored.connect(self._on_error, Qt.QueuedConnection)
+        self.adapter_future = None
         self.adapter = None
         self.translator = None
         self.worker_thread = None
         self.running = False
         self.log = QTextEdit()
         self.log.setReadOnly(True)
+        self.log.document().setMaximumBlockCount(5000)
+        self._pending = []
+        self._flush_scheduled = False
         self.adapter_select = QComboBox()
         self.adapter_select.addItems(["file","ocr","clipboard"])
         self.source_input = QLineEdit()
@@ -174,9 +502,6 @@ class TranslatorApp(QWidget):
         layout.addLayout(btn_row)
         layout.addWidget(self.log)
         self.setLayout(layout)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._process_queues)
-        self.timer.start(120)
     def on_browse(self):
         adapter = self.adapter_select.currentText()
         if adapter == 'file':
@@ -221,8 +546,7 @@ class TranslatorApp(QWidget):
         self.running = True
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
-        self.adapter_thread = threading.Thread(target=self.adapter.run,args=(self.in_queue,),daemon=True)
-        self.adapter_thread.start()
+        self.adapter_future = asyncio.run_coroutine_threadsafe(self.adapter.run(self.in_queue), _ensure_loop())
         self.worker_thread = threading.Thread(target=self._worker,args=(target_language,),daemon=True)
         self.worker_thread.start()
         self.log.append(f"[System] Started adapter: {adapter_name}")
@@ -244,23 +568,57 @@ class TranslatorApp(QWidget):
                 item = self.in_queue.get(timeout=0.2)
             except queue.Empty:
                 continue
-            if isinstance(item,str) and item.startswith('__ERROR__'):
-                self.out_queue.put(item)
-                continue
-            translated = self.translator.translate(item,target_language)
-            self.out_queue.put((item,translated))
-            time.sleep(0.05)
-    def _process_queues(self):
-        while not self.out_queue.empty():
-            obj = self.out_queue.get()
-            if isinstance(obj,str) and obj.startswith('__ERROR__'):
-                self.log.append(f"[Error] {obj}")
-            else:
-                orig, trans = obj
-                if self.overlay_checkbox.isChecked():
-                    self.log.append(f"{trans}")
+            batch = [item]
+            deadline = time.monotonic() + 0.05
+            while len(batch) < 8 and time.monotonic() < deadline:
+                try:
+                    batch.append(self.in_queue.get_nowait())
+                except queue.Empty:
+                    time.sleep(0.005)
+            texts = []
+            for item in batch:
+                if isinstance(item,str) and item.startswith('__ERROR__'):
+                    self.bridge.errored.emit(item)
                 else:
-                    self.log.append(f"[ORIG] {orig}\n[TRANSLATION] {trans}\n")
+                    texts.append(item)
+            if not texts:
+                continue
+            fut = self.translator.submit_batch(texts,target_language)
+            fut.add_done_callback(lambda f, t=texts: self._on_batch_done(t,f))
+    def _on_batch_done(self,texts,fut):
+        try:
+            translations = fut.result()
+        except Exception as e:
+            translations = [f"__ERROR__ Translator: {e}"]*len(texts)
+        for orig, trans in zip(texts, translations):
+            self.bridge.translated.emit(orig,trans)
+    def _on_translated(self,orig,trans):
+        if self.overlay_checkbox.isChecked():
+            self._queue_line(f"{trans}")
+        else:
+            self._queue_line(f"[ORIG] {orig}\n[TRANSLATION] {trans}\n")
+    def _on_error(self,msg):
+        self._queue_line(f"[Error] {msg}")
+    def _queue_line(self,msg):
+        self._pending.append(msg)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self._flush_log)
+    def _flush_log(self):
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        text = "\n".join(self._pending[:64])
+        del self._pending[:64]
+        if self._pending:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self._flush_log)
+        c = self.log.textCursor()
+        c.movePosition(QTextCursor.End)
+        c.beginEditBlock()
+        c.insertText(text + "\n")
+        c.endEditBlock()
+        self.log.setTextCursor(c)
 
 def main():
     tpath = os.environ.get('TESSERACT_PATH')